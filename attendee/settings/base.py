@@ -222,6 +222,28 @@ if STORAGE_PROTOCOL == "azure":
     }
     RECORDING_STORAGE_BACKEND = copy.deepcopy(DEFAULT_STORAGE_BACKEND)
     RECORDING_STORAGE_BACKEND["OPTIONS"]["azure_container"] = AZURE_RECORDING_STORAGE_CONTAINER_NAME
+
+    # Without a connection string or account key, authenticate with Azure AD. One credential is shared by the
+    # storage backends and the recording uploader, so they all reuse the same token cache. It is added after
+    # the deepcopy above so that every backend gets the same instance.
+    if not os.getenv("AZURE_CONNECTION_STRING") and not os.getenv("AZURE_ACCOUNT_KEY"):
+        from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
+
+        if os.getenv("AZURE_STORAGE_USE_MSI", "false") == "true":
+            AZURE_STORAGE_TOKEN_CREDENTIAL = ManagedIdentityCredential()
+        else:
+            # Only the environment, workload identity and managed identity credentials make sense on a server.
+            # The developer tool credentials shell out or probe local caches and would slow down every token request.
+            AZURE_STORAGE_TOKEN_CREDENTIAL = DefaultAzureCredential(
+                exclude_cli_credential=True,
+                exclude_developer_cli_credential=True,
+                exclude_powershell_credential=True,
+                exclude_visual_studio_code_credential=True,
+                exclude_shared_token_cache_credential=True,
+                exclude_interactive_browser_credential=True,
+            )
+        DEFAULT_STORAGE_BACKEND["OPTIONS"]["token_credential"] = AZURE_STORAGE_TOKEN_CREDENTIAL
+        RECORDING_STORAGE_BACKEND["OPTIONS"]["token_credential"] = AZURE_STORAGE_TOKEN_CREDENTIAL
 else:
     DEFAULT_STORAGE_BACKEND = {
         "BACKEND": "storages.backends.s3.S3Storage",
@@ -1,11 +1,83 @@
+import hashlib
+import io
 import logging
+import mmap
+import os
 import threading
 from pathlib import Path
 
-from azure.storage.blob import BlobClient, BlobServiceClient
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobClient, BlobServiceClient, ContentSettings, ExponentialRetry
+from requests.adapters import HTTPAdapter
+
+from .background_upload import start_background_upload, wait_for_background_upload
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+# Recordings can be several GB, so upload more blocks in parallel and in bigger chunks than the SDK defaults.
+AZURE_UPLOAD_MAX_CONCURRENCY = int(os.getenv("AZURE_UPLOAD_MAX_CONCURRENCY", 16))
+AZURE_UPLOAD_BLOCK_SIZE = int(os.getenv("AZURE_UPLOAD_BLOCK_SIZE", 8 * 1024 * 1024))
+AZURE_CONNECTION_POOL_SIZE = max(32, AZURE_UPLOAD_MAX_CONCURRENCY)
+# Store the MD5 of the whole file on the blob so downstream consumers can verify its integrity
+AZURE_UPLOAD_SET_CONTENT_MD5 = os.getenv("AZURE_UPLOAD_SET_CONTENT_MD5", "false") == "true"
+
+# BlobServiceClients are thread-safe and hold the HTTP connection pool, so we share one per
+# set of credentials across uploads instead of paying for new TLS handshakes on every file.
+_blob_service_clients = {}
+_blob_service_clients_lock = threading.Lock()
+
+
+def _build_blob_service_client_options():
+    # The default requests pool keeps only 10 connections per host, fewer than the number of blocks
+    # we upload in parallel, so connections would be thrown away and re-opened on every burst.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=AZURE_CONNECTION_POOL_SIZE, pool_maxsize=AZURE_CONNECTION_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return {
+        "max_block_size": AZURE_UPLOAD_BLOCK_SIZE,
+        "transport": RequestsTransport(session=session, session_owner=False),
+        # The SDK default waits 15s before the first retry; back off faster but retry more times
+        "retry_policy": ExponentialRetry(initial_backoff=1, increment_base=2, retry_total=5, retry_connect=3),
+    }
+
+
+def _get_blob_service_client(connection_string, account_key, account_name, token_credential=None):
+    cache_key = (connection_string, account_name, account_key, token_credential)
+    with _blob_service_clients_lock:
+        service_client = _blob_service_clients.get(cache_key)
+        if service_client is None:
+            # Block size, transport and retries are client-level settings, so they have to be set when the client is built
+            client_options = _build_blob_service_client_options()
+            if connection_string:
+                service_client = BlobServiceClient.from_connection_string(connection_string, **client_options)
+            else:
+                account_url = f"https://{account_name}.blob.core.windows.net"
+                credential = account_key or token_credential
+                service_client = BlobServiceClient(account_url=account_url, credential=credential, **client_options)
+            _blob_service_clients[cache_key] = service_client
+        return service_client
+
+
+def warm_up_blob_service_client(container, connection_string, account_key, account_name, token_credential=None):
+    """Build the shared BlobServiceClient in the background and send it one cheap request.
+
+    With Azure AD authentication, the first request on a client pays for the token fetch. Doing that while
+    the bot is still in the meeting means the recording upload at the end can reuse the cached token.
+    """
+
+    def warm_up_worker():
+        try:
+            service_client = _get_blob_service_client(connection_string, account_key, account_name, token_credential)
+            service_client.get_container_client(container).get_container_properties()
+            logger.info("Warmed up Azure blob client for container %s", container)
+        except Exception as e:
+            # Credentials that can't read container properties still fetched the token
+            logger.warning("Azure blob client warm-up request failed: %s", e)
+
+    threading.Thread(target=warm_up_worker, daemon=True, name="azure-warm-up").start()
 
 
 class AzureFileUploader:
@@ -16,6 +88,7 @@ class AzureFileUploader:
         connection_string,
         account_key,
         account_name,
+        token_credential=None,
     ):
         """
         Initialize the AzureFileUploader with a target container and blob name.
@@ -26,25 +99,27 @@ class AzureFileUploader:
             connection_string (str, optional): Full Azure Storage connection string.
             account_key (str, optional): Account key (used if no connection string).
             account_name (str, optional): Account name (used if no connection string).
+            token_credential (TokenCredential, optional): Azure AD credential (used with account_name if no account key).
         """
         if not container or not filename:
             raise ValueError("Both 'container' and 'filename' are required")
 
-        # Prefer connection string if provided; otherwise fall back to account_name + account_key
-        if connection_string:
-            service_client = BlobServiceClient.from_connection_string(connection_string)
-        elif account_name and account_key:
-            account_url = f"https://{account_name}.blob.core.windows.net"
-            service_client = BlobServiceClient(account_url=account_url, credential=account_key)
-        else:
-            raise ValueError("Provide either connection string or both account_name and account_key")
+        # Prefer connection string if provided; otherwise fall back to account_name + account_key,
+        # and to Azure AD authentication if there is no account key
+        if not connection_string and not (account_name and (account_key or token_credential)):
+            raise ValueError("Provide either connection string or account_name with account_key or token_credential")
+        service_client = _get_blob_service_client(connection_string, account_key, account_name, token_credential)
 
         # Keep a BlobClient ready to use (mirrors S3 "bucket/key" pairing)
         self.container = container
         self.filename = filename
         self.blob_client: BlobClient = service_client.get_blob_client(container=container, blob=filename)
+        # The URL is fixed for the lifetime of the uploader, so build it once rather than after every upload.
+        # Drop the query string, which holds the SAS token when authenticating with one.
+        self.blob_url = self.blob_client.url.split("?")[0]
 
-        self._upload_thread = None
+        self._upload_future = None
+        self._upload_callback = None
 
     def upload_file(self, file_path: str, callback=None):
         """Start an asynchronous upload of a file to Azure Blob Storage.
@@ -53,8 +128,8 @@ class AzureFileUploader:
             file_path (str): Path to the local file to upload.
             callback (callable, optional): Function to call when upload completes; receives True/False.
         """
-        self._upload_thread = threading.Thread(target=self._upload_worker, args=(file_path, callback), daemon=True)
-        self._upload_thread.start()
+        self._upload_callback = callback
+        self._upload_future = start_background_upload(self._upload_worker, file_path, callback)
 
     def _upload_worker(self, file_path: str, callback=None):
         """Background thread that handles the actual file upload."""
@@ -64,25 +139,77 @@ class AzureFileUploader:
                 raise FileNotFoundError(f"File not found: {file_path}")
 
             # Upload the file; let the SDK handle chunking under the hood.
-            with file_path.open("rb") as f:
-                # overwrite=True to mirror typical "upsert" behavior similar to S3 put
-                self.blob_client.upload_blob(f, overwrite=True)
-
-            account_url = self.blob_client.url.split(f"/{self.container}/")[0]
-            logger.info(f"Successfully uploaded {file_path} to {account_url}/{self.container}/{self.filename}")
+            # Passing the length up front saves the SDK from probing the stream with seek/tell.
+            file_size = file_path.stat().st_size
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                # We read the file front to back, so let the kernel prefetch aggressively
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+                with self._open_for_upload(fd, file_size) as data:
+                    # Sending the MD5 with the upload avoids a separate set_http_headers request afterwards
+                    content_settings = ContentSettings(content_md5=self._compute_md5(data)) if AZURE_UPLOAD_SET_CONTENT_MD5 else None
+                    # overwrite=True to mirror typical "upsert" behavior similar to S3 put
+                    self.blob_client.upload_blob(
+                        data,
+                        overwrite=True,
+                        length=file_size,
+                        max_concurrency=AZURE_UPLOAD_MAX_CONCURRENCY,
+                        content_settings=content_settings,
+                    )
+            finally:
+                os.close(fd)
+
+            logger.info("Successfully uploaded %s to %s", file_path, self.blob_url)
 
             if callback:
                 callback(True)
 
         except Exception as e:
-            logger.error(f"Upload error: {e}")
+            logger.error("Upload error: %s", e)
             if callback:
                 callback(False)
 
-    def wait_for_upload(self):
-        """Wait for the current upload to complete."""
-        if self._upload_thread and self._upload_thread.is_alive():
-            self._upload_thread.join()
+    def _open_for_upload(self, fd, file_size):
+        """Return a readable view of the open file for the SDK to upload from."""
+        # mmap can't map an empty file
+        if file_size == 0:
+            return io.BytesIO(b"")
+
+        # The SDK still copies each block out with read(), the same as it would from a file object.
+        # What the mapping buys is direct access to the page cache, so _compute_md5 can hash the file in place.
+        try:
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not memory-map file for upload, falling back to buffered reads: %s", e)
+
+        # Read in chunks that match the upload block size, so each block is filled by one read
+        return io.BufferedReader(io.FileIO(fd, closefd=False), buffer_size=AZURE_UPLOAD_BLOCK_SIZE)
+
+    def _compute_md5(self, data):
+        """Return the MD5 digest of everything in data, leaving it positioned at the start."""
+        # Blocks are read concurrently and out of order during the upload, so the hash can't be
+        # accumulated from the SDK's reads. A mapped file can be hashed in place without copying it.
+        if isinstance(data, mmap.mmap):
+            return hashlib.md5(data).digest()
+
+        md5 = hashlib.md5()
+        for chunk in iter(lambda: data.read(AZURE_UPLOAD_BLOCK_SIZE), b""):
+            md5.update(chunk)
+        data.seek(0)
+        return md5.digest()
+
+    def wait_for_upload(self, timeout=None):
+        """Wait for the current upload to complete.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Waits indefinitely if not provided.
+
+        Returns:
+            bool: True if the upload finished (or none was started), False if the wait timed out
+        """
+        return wait_for_background_upload(self._upload_future, self.filename, timeout=timeout, callback=self._upload_callback)
 
     def delete_file(self, file_path: str):
         """Delete a file from the local filesystem (same behavior as the S3 version)."""
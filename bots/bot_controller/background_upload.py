@@ -0,0 +1,56 @@
+import logging
+import os
+import threading
+from concurrent.futures import Future, wait
+
+logger = logging.getLogger(__name__)
+
+# Uploads run on daemon threads so that a hung upload can never keep the bot process from exiting
+# (ThreadPoolExecutor workers are joined at interpreter exit). The semaphore caps how many of those
+# threads upload at once across all providers.
+_upload_slots = threading.BoundedSemaphore(int(os.getenv("MAX_CONCURRENT_FILE_UPLOADS", 8)))
+
+
+def start_background_upload(upload_worker, *args):
+    """Run upload_worker(*args) on a daemon thread once an upload slot is free.
+
+    Returns:
+        Future: Resolves when the upload finishes. It stays pending while the upload waits for a slot.
+    """
+    future = Future()
+
+    def run_upload():
+        with _upload_slots:
+            if not future.set_running_or_notify_cancel():
+                return
+            upload_worker(*args)
+            future.set_result(None)
+
+    threading.Thread(target=run_upload, daemon=True).start()
+    return future
+
+
+def wait_for_background_upload(future, upload_name, timeout=None, callback=None):
+    """Wait for an upload started by start_background_upload.
+
+    Args:
+        future (Future, optional): The future returned by start_background_upload, or None if no upload was started.
+        upload_name (str): Name of the uploaded file, used when logging a timeout.
+        timeout (float, optional): Maximum number of seconds to wait. Waits indefinitely if not provided.
+        callback (callable, optional): The upload's callback. Called with False if the upload is cancelled.
+
+    Returns:
+        bool: True if the upload finished (or none was started), False if the wait timed out
+    """
+    if not future:
+        return True
+
+    done, not_done = wait([future], timeout=timeout)
+    if not_done:
+        logger.error("Timed out after %s seconds waiting for upload of %s", timeout, upload_name)
+        # Cancelling only succeeds if the upload is still waiting for an upload slot. It will then
+        # never run, so report the failure to the callback here instead.
+        if future.cancel() and callback:
+            callback(False)
+        return False
+    return True
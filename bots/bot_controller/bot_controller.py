@@ -47,6 +47,7 @@ from bots.models import (
     Recording,
     RecordingFormats,
     RecordingManager,
+    RecordingStates,
     RecordingTypes,
     TranscriptionProviders,
     Utterance,
@@ -58,7 +59,7 @@ from bots.websocket_payloads import mixed_audio_websocket_payload
 from bots.zoom_oauth_connections_utils import get_zoom_tokens_via_zoom_oauth_app
 
 from .audio_output_manager import AudioOutputManager
-from .azure_file_uploader import AzureFileUploader
+from .azure_file_uploader import AzureFileUploader, warm_up_blob_service_client
 from .bot_resource_snapshot_taker import BotResourceSnapshotTaker
 from .closed_caption_manager import ClosedCaptionManager
 from .grouped_closed_caption_manager import GroupedClosedCaptionManager
@@ -82,6 +83,11 @@ logger = logging.getLogger(__name__)
 class BotController:
     # Default wait time for utterance termination (5 minutes)
     UTTERANCE_TERMINATION_WAIT_TIME_SECONDS = 300
+    # How long after cleanup starts the worker process is force terminated (10 minutes)
+    CLEANUP_HARD_TIMEOUT_SECONDS = 600
+    # How long after cleanup starts we stop waiting for the recording uploads. Kept under the hard timeout,
+    # so a stuck upload gets logged and the rest of cleanup still runs.
+    RECORDING_UPLOAD_TIMEOUT_SECONDS = 540
 
     def use_streaming_transcription(self):
         provider = self.get_recording_transcription_provider()
@@ -396,6 +402,13 @@ class BotController:
         recording.first_buffer_timestamp_ms = self.get_first_buffer_timestamp_ms()
         recording.save()
 
+    def recording_file_upload_timed_out(self):
+        recording = Recording.objects.get(bot=self.bot_in_db, is_default_recording=True)
+        logger.error(f"Marking recording {recording.object_id} as failed because its upload did not finish in time")
+        # The recording is already in a terminal state if the bot hit a fatal error before cleanup
+        if recording.state == RecordingStates.IN_PROGRESS or recording.state == RecordingStates.PAUSED:
+            RecordingManager.set_recording_failed(recording)
+
     def get_recording_transcription_provider(self):
         recording = Recording.objects.get(bot=self.bot_in_db, is_default_recording=True)
         return recording.transcription_provider
@@ -423,19 +436,21 @@ class BotController:
         else:
             raise Exception("No rtmp client found")
 
-    def upload_recording_to_external_media_storage_if_enabled(self):
+    # Starts the upload to the external media storage bucket and returns its file uploader without waiting
+    # for it to finish. Returns None if there is nothing to upload or the upload could not be started.
+    def start_upload_recording_to_external_media_storage_if_enabled(self):
         if not self.bot_in_db.external_media_storage_bucket_name():
-            return
+            return None
 
         external_media_storage_credentials_record = self.bot_in_db.project.credentials.filter(credential_type=Credentials.CredentialTypes.EXTERNAL_MEDIA_STORAGE).first()
         if not external_media_storage_credentials_record:
             logger.error(f"No external media storage credentials found for bot {self.bot_in_db.id}")
-            return
+            return None
 
         external_media_storage_credentials = external_media_storage_credentials_record.get_credentials()
         if not external_media_storage_credentials:
             logger.error(f"External media storage credentials data not found for bot {self.bot_in_db.id}")
-            return
+            return None
 
         try:
             logger.info(f"Uploading recording to external media storage bucket {self.bot_in_db.external_media_storage_bucket_name()}")
@@ -448,10 +463,21 @@ class BotController:
                 access_key_secret=external_media_storage_credentials.get("access_key_secret"),
             )
             file_uploader.upload_file(self.get_recording_file_location())
-            file_uploader.wait_for_upload()
+            return file_uploader
+        except Exception as e:
+            logger.exception(f"Error uploading recording to external media storage bucket {self.bot_in_db.external_media_storage_bucket_name()}: {e}")
+            return None
+
+    # Returns False if the upload may still be reading the recording file
+    def wait_for_upload_recording_to_external_media_storage(self, file_uploader, timeout=None):
+        try:
+            if not file_uploader.wait_for_upload(timeout=timeout):
+                return False
             logger.info(f"File uploader finished uploading file to external media storage bucket {self.bot_in_db.external_media_storage_bucket_name()}")
+            return True
         except Exception as e:
             logger.exception(f"Error uploading recording to external media storage bucket {self.bot_in_db.external_media_storage_bucket_name()}: {e}")
+            return False
 
     def get_file_uploader(self):
         if settings.STORAGE_PROTOCOL == "azure":
@@ -461,6 +487,7 @@ class BotController:
                 connection_string=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("connection_string"),
                 account_key=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("account_key"),
                 account_name=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("account_name"),
+                token_credential=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("token_credential"),
             )
 
         return S3FileUploader(
@@ -469,11 +496,29 @@ class BotController:
             endpoint_url=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("endpoint_url"),
         )
 
+    def warm_up_file_uploader(self):
+        # S3 clients make no network calls when built, so only the Azure client benefits from warming up,
+        # and only when it authenticates with Azure AD and has a token to fetch
+        if settings.STORAGE_PROTOCOL != "azure":
+            return
+        token_credential = settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("token_credential")
+        if not token_credential:
+            return
+
+        warm_up_blob_service_client(
+            container=settings.AZURE_RECORDING_STORAGE_CONTAINER_NAME,
+            connection_string=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("connection_string"),
+            account_key=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("account_key"),
+            account_name=settings.RECORDING_STORAGE_BACKEND.get("OPTIONS").get("account_name"),
+            token_credential=token_credential,
+        )
+
     def cleanup(self):
         if self.cleanup_called:
             logger.info("Cleanup already called, exiting")
             return
         self.cleanup_called = True
+        cleanup_started_at = time.time()
 
         normal_quitting_process_worked = False
         import threading
@@ -481,7 +526,7 @@ class BotController:
         def terminate_worker():
             import time
 
-            time.sleep(600)
+            time.sleep(max(0, cleanup_started_at + self.CLEANUP_HARD_TIMEOUT_SECONDS - time.time()))
             if normal_quitting_process_worked:
                 logger.info("Normal quitting process worked, not force terminating worker")
                 return
@@ -525,16 +570,32 @@ class BotController:
             self.websocket_audio_client.cleanup()
 
         if self.get_recording_file_location():
-            self.upload_recording_to_external_media_storage_if_enabled()
+            # Both uploads share one deadline, since they run at the same time
+            upload_deadline = cleanup_started_at + self.RECORDING_UPLOAD_TIMEOUT_SECONDS
+            external_media_storage_file_uploader = self.start_upload_recording_to_external_media_storage_if_enabled()
 
             logger.info("Telling file uploader to upload recording file...")
             file_uploader = self.get_file_uploader()
             file_uploader.upload_file(self.get_recording_file_location())
-            file_uploader.wait_for_upload()
-            logger.info("File uploader finished uploading file")
-            file_uploader.delete_file(self.get_recording_file_location())
-            logger.info("File uploader deleted file from local filesystem")
-            self.recording_file_saved(file_uploader.filename)
+            upload_finished = file_uploader.wait_for_upload(timeout=max(0, upload_deadline - time.time()))
+            if upload_finished:
+                logger.info("File uploader finished uploading file")
+
+            external_media_storage_upload_finished = True
+            if external_media_storage_file_uploader:
+                external_media_storage_upload_finished = self.wait_for_upload_recording_to_external_media_storage(external_media_storage_file_uploader, timeout=max(0, upload_deadline - time.time()))
+
+            # An upload that is still running may still be reading the file, so only delete it once both have finished
+            if upload_finished and external_media_storage_upload_finished:
+                file_uploader.delete_file(self.get_recording_file_location())
+                logger.info("File uploader deleted file from local filesystem")
+            else:
+                logger.error("Not deleting recording file from local filesystem because an upload did not finish in time")
+
+            if upload_finished:
+                self.recording_file_saved(file_uploader.filename)
+            else:
+                self.recording_file_upload_timed_out()
 
         if self.bot_in_db.create_debug_recording():
             self.save_debug_recording()
@@ -693,6 +754,9 @@ class BotController:
 
         self.connect_to_redis()
 
+        # Get the storage client ready now, so the upload at the end of the meeting doesn't wait on authentication
+        self.warm_up_file_uploader()
+
         # Initialize core objects
         # Only used for adapters that can provide per-participant audio
 
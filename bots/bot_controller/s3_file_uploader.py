@@ -1,11 +1,31 @@
+import functools
 import logging
-import threading
+import os
 from pathlib import Path
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from .background_upload import start_background_upload, wait_for_background_upload
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+# Match the Azure uploader: 8 MiB multipart chunks, 16 in flight at a time (boto3 defaults to 10)
+_transfer_config = TransferConfig(
+    multipart_chunksize=int(os.getenv("S3_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)),
+    max_concurrency=int(os.getenv("S3_UPLOAD_MAX_CONCURRENCY", 16)),
+    use_threads=True,
+)
+
+
+# Building a boto3 client loads and parses the S3 service model, which is far more expensive than the
+# client calls themselves. The configuration never changes within a process, so build each client once.
+@functools.lru_cache(maxsize=8)
+def _get_s3_client(endpoint_url, region_name, access_key_id, access_key_secret):
+    # Keep enough pooled connections for every in-flight multipart chunk
+    config = Config(max_pool_connections=max(10, _transfer_config.max_request_concurrency))
+    return boto3.client("s3", endpoint_url=endpoint_url, region_name=region_name, aws_access_key_id=access_key_id, aws_secret_access_key=access_key_secret, config=config)
 
 
 class S3FileUploader:
@@ -16,10 +36,11 @@ class S3FileUploader:
             bucket (str): The name of the S3 bucket to upload to
             filename (str): The name of the to be stored file
         """
-        self.s3_client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region_name, aws_access_key_id=access_key_id, aws_secret_access_key=access_key_secret)
+        self.s3_client = _get_s3_client(endpoint_url, region_name, access_key_id, access_key_secret)
         self.bucket = bucket
         self.filename = filename
-        self._upload_thread = None
+        self._upload_future = None
+        self._upload_callback = None
 
     def upload_file(self, file_path: str, callback=None):
         """Start an asynchronous upload of a file to S3.
@@ -28,8 +49,8 @@ class S3FileUploader:
             file_path (str): Path to the local file to upload
             callback (callable, optional): Function to call when upload completes
         """
-        self._upload_thread = threading.Thread(target=self._upload_worker, args=(file_path, callback), daemon=True)
-        self._upload_thread.start()
+        self._upload_callback = callback
+        self._upload_future = start_background_upload(self._upload_worker, file_path, callback)
 
     def _upload_worker(self, file_path: str, callback=None):
         """Background thread that handles the actual file upload.
@@ -44,22 +65,28 @@ class S3FileUploader:
                 raise FileNotFoundError(f"File not found: {file_path}")
 
             # Upload the file using S3's multipart upload functionality
-            self.s3_client.upload_file(str(file_path), self.bucket, self.filename)
+            self.s3_client.upload_file(str(file_path), self.bucket, self.filename, Config=_transfer_config)
 
-            logger.info(f"Successfully uploaded {file_path} to s3://{self.bucket}/{self.filename}")
+            logger.info("Successfully uploaded %s to s3://%s/%s", file_path, self.bucket, self.filename)
 
             if callback:
                 callback(True)
 
         except Exception as e:
-            logger.error(f"Upload error: {e}")
+            logger.error("Upload error: %s", e)
             if callback:
                 callback(False)
 
-    def wait_for_upload(self):
-        """Wait for the current upload to complete."""
-        if self._upload_thread and self._upload_thread.is_alive():
-            self._upload_thread.join()
+    def wait_for_upload(self, timeout=None):
+        """Wait for the current upload to complete.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Waits indefinitely if not provided.
+
+        Returns:
+            bool: True if the upload finished (or none was started), False if the wait timed out
+        """
+        return wait_for_background_upload(self._upload_future, self.filename, timeout=timeout, callback=self._upload_callback)
 
     def delete_file(self, file_path: str):
         """Delete a file from the local filesystem."""
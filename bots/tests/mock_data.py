@@ -134,7 +134,7 @@ def create_mock_video_frame(width=640, height=480):
 def create_mock_file_uploader():
     mock_file_uploader = MagicMock()
     mock_file_uploader.upload_file.return_value = None
-    mock_file_uploader.wait_for_upload.return_value = None
+    mock_file_uploader.wait_for_upload.return_value = True
     mock_file_uploader.delete_file.return_value = None
     mock_file_uploader.filename = "test-recording-key"
     return mock_file_uploader
@@ -0,0 +1,139 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from bots.bot_controller.azure_file_uploader import AzureFileUploader
+from bots.bot_controller.s3_file_uploader import S3FileUploader
+
+# A SAS connection string; building a client from it makes no network calls
+AZURE_SAS_CONNECTION_STRING = "BlobEndpoint=https://testaccount.blob.core.windows.net/;SharedAccessSignature=sv=2022-11-02&ss=b&srt=o&sp=rw&sig=SECRET"
+
+
+def create_azure_file_uploader(filename="test-recording.mp4"):
+    return AzureFileUploader(
+        container="test-container",
+        filename=filename,
+        connection_string=AZURE_SAS_CONNECTION_STRING,
+        account_key=None,
+        account_name=None,
+    )
+
+
+class TestAzureFileUploader(TestCase):
+    def test_blob_url_excludes_sas_token(self):
+        uploader = create_azure_file_uploader(filename="test recording.mp4")
+
+        self.assertEqual(uploader.blob_url, "https://testaccount.blob.core.windows.net/test-container/test%20recording.mp4")
+        self.assertNotIn("SECRET", uploader.blob_url)
+
+    def test_account_name_without_key_or_token_credential_is_rejected(self):
+        with self.assertRaises(ValueError):
+            AzureFileUploader(container="test-container", filename="test-recording.mp4", connection_string=None, account_key=None, account_name="keylessaccount")
+
+    def test_account_name_with_token_credential_uses_it(self):
+        token_credential = MagicMock()
+        uploader = AzureFileUploader(
+            container="test-container",
+            filename="test-recording.mp4",
+            connection_string=None,
+            account_key=None,
+            account_name="tokenaccount",
+            token_credential=token_credential,
+        )
+
+        self.assertIs(uploader.blob_client.credential, token_credential)
+        self.assertEqual(uploader.blob_url, "https://tokenaccount.blob.core.windows.net/test-container/test-recording.mp4")
+
+
+class TestAzureFileUploaderContentMD5(TestCase):
+    def setUp(self):
+        self.uploader = create_azure_file_uploader()
+        self.file_contents = os.urandom(3 * 1024 * 1024 + 17)
+        temp_file = tempfile.NamedTemporaryFile(delete=False)
+        temp_file.write(self.file_contents)
+        temp_file.close()
+        self.addCleanup(os.unlink, temp_file.name)
+        self.fd = os.open(temp_file.name, os.O_RDONLY)
+        self.addCleanup(os.close, self.fd)
+
+    def test_compute_md5_of_mapped_file(self):
+        with self.uploader._open_for_upload(self.fd, len(self.file_contents)) as data:
+            self.assertIsInstance(data, mmap.mmap)
+            self.assertEqual(self.uploader._compute_md5(data), hashlib.md5(self.file_contents).digest())
+            self.assertEqual(data.tell(), 0)
+
+    @patch("bots.bot_controller.azure_file_uploader.AZURE_UPLOAD_BLOCK_SIZE", 1024 * 1024)
+    def test_compute_md5_of_buffered_fallback_rewinds(self):
+        with patch("bots.bot_controller.azure_file_uploader.mmap.mmap", side_effect=OSError("mmap not supported")):
+            data = self.uploader._open_for_upload(self.fd, len(self.file_contents))
+
+        with data:
+            self.assertIsInstance(data, io.BufferedReader)
+            self.assertEqual(self.uploader._compute_md5(data), hashlib.md5(self.file_contents).digest())
+            # The upload reads from the same object next, so it must start from the beginning
+            self.assertEqual(data.tell(), 0)
+            self.assertEqual(data.read(), self.file_contents)
+
+    def test_compute_md5_of_empty_file(self):
+        with self.uploader._open_for_upload(self.fd, 0) as data:
+            self.assertEqual(self.uploader._compute_md5(data), hashlib.md5(b"").digest())
+
+
+@patch("bots.bot_controller.s3_file_uploader._get_s3_client", return_value=MagicMock())
+class TestS3FileUploaderWaitForUpload(TestCase):
+    def test_wait_for_upload_returns_true_when_upload_finishes(self, mock_get_s3_client):
+        uploader = S3FileUploader(bucket="test-bucket", filename="test-recording.mp4")
+        callback = MagicMock()
+
+        with patch.object(uploader, "_upload_worker") as mock_upload_worker:
+            uploader.upload_file("/tmp/test-recording.mp4", callback=callback)
+            self.assertTrue(uploader.wait_for_upload(timeout=5))
+
+        mock_upload_worker.assert_called_once_with("/tmp/test-recording.mp4", callback)
+
+    def test_wait_for_upload_cancels_upload_still_waiting_for_a_slot(self, mock_get_s3_client):
+        uploader = S3FileUploader(bucket="test-bucket", filename="test-recording.mp4")
+        callback = MagicMock()
+        upload_slots = threading.BoundedSemaphore(1)
+
+        with patch("bots.bot_controller.background_upload._upload_slots", upload_slots), patch.object(uploader, "_upload_worker") as mock_upload_worker:
+            # Take the only slot, so the upload stays queued
+            upload_slots.acquire()
+            uploader.upload_file("/tmp/test-recording.mp4", callback=callback)
+
+            self.assertFalse(uploader.wait_for_upload(timeout=0.1))
+            self.assertTrue(uploader._upload_future.cancelled())
+            callback.assert_called_once_with(False)
+
+            upload_slots.release()
+            mock_upload_worker.assert_not_called()
+
+    def test_wait_for_upload_times_out_on_running_upload(self, mock_get_s3_client):
+        uploader = S3FileUploader(bucket="test-bucket", filename="test-recording.mp4")
+        callback = MagicMock()
+        upload_started = threading.Event()
+        release_upload = threading.Event()
+
+        def slow_upload_worker(file_path, callback=None):
+            upload_started.set()
+            release_upload.wait(timeout=5)
+            callback(True)
+
+        with patch.object(uploader, "_upload_worker", side_effect=slow_upload_worker):
+            uploader.upload_file("/tmp/test-recording.mp4", callback=callback)
+            self.assertTrue(upload_started.wait(timeout=5))
+
+            # A running upload can't be cancelled, so it's left to finish and report to the callback itself
+            self.assertFalse(uploader.wait_for_upload(timeout=0.1))
+            self.assertFalse(uploader._upload_future.cancelled())
+            callback.assert_not_called()
+
+            release_upload.set()
+            self.assertTrue(uploader.wait_for_upload(timeout=5))
+            callback.assert_called_once_with(True)
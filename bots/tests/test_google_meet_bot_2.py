@@ -125,6 +125,11 @@ class TestGoogleMeetBot2(TransactionTestCase):
         settings.CELERY_TASK_ALWAYS_EAGER = True
         settings.CELERY_TASK_EAGER_PROPAGATES = True
 
+        # Don't let the bot controller warm up a real Azure blob client in the background
+        warm_up_patcher = patch("bots.bot_controller.bot_controller.warm_up_blob_service_client")
+        self.mock_warm_up_blob_service_client = warm_up_patcher.start()
+        self.addCleanup(warm_up_patcher.stop)
+
     @patch("kubernetes.client.CoreV1Api")
     @patch("kubernetes.config.load_incluster_config")
     @patch("kubernetes.config.load_kube_config")
@@ -197,6 +202,31 @@ class TestGoogleMeetBot2(TransactionTestCase):
         fatal_error_event = self.bot.bot_events.filter(event_type=BotEventTypes.FATAL_ERROR, event_sub_type=BotEventSubTypes.FATAL_ERROR_HEARTBEAT_TIMEOUT).first()
         self.assertIsNone(fatal_error_event)
 
+    @override_settings(RECORDING_STORAGE_BACKEND={"OPTIONS": {"account_name": "fake", "token_credential": MagicMock()}})
+    @patch("bots.bot_controller.bot_controller.PerParticipantNonStreamingAudioInputManager", side_effect=RuntimeError("Stop right after the warm-up"))
+    @patch("bots.bot_controller.bot_controller.BotController.connect_to_redis")
+    def test_run_warms_up_azure_blob_client(self, mock_connect_to_redis, MockPerParticipantNonStreamingAudioInputManager):
+        controller = BotController(self.bot.id)
+
+        # The warm-up happens before any of the meeting machinery is set up
+        with self.assertRaises(RuntimeError):
+            controller.run()
+
+        self.mock_warm_up_blob_service_client.assert_called_once()
+        self.assertEqual(self.mock_warm_up_blob_service_client.call_args.kwargs["container"], "test-container")
+
+    @override_settings(RECORDING_STORAGE_BACKEND={"OPTIONS": {"connection_string": "fake", "account_key": "fake", "account_name": "fake"}})
+    @patch("bots.bot_controller.bot_controller.PerParticipantNonStreamingAudioInputManager", side_effect=RuntimeError("Stop right after the warm-up"))
+    @patch("bots.bot_controller.bot_controller.BotController.connect_to_redis")
+    def test_run_skips_azure_warm_up_without_token_credential(self, mock_connect_to_redis, MockPerParticipantNonStreamingAudioInputManager):
+        controller = BotController(self.bot.id)
+
+        with self.assertRaises(RuntimeError):
+            controller.run()
+
+        # Account keys and connection strings have no token to fetch, so there is nothing to warm up
+        self.mock_warm_up_blob_service_client.assert_not_called()
+
     @patch("bots.web_bot_adapter.web_bot_adapter.Display")
     @patch("bots.web_bot_adapter.web_bot_adapter.webdriver.Chrome")
     @patch("bots.bot_controller.bot_controller.AzureFileUploader")
@@ -1325,6 +1355,14 @@ class TestGoogleMeetBot2(TransactionTestCase):
         mock_s3_uploader = create_mock_file_uploader()
         MockS3FileUploader.return_value = mock_s3_uploader
 
+        # Attach the uploader methods to one parent mock so we can check the order they're called in
+        upload_call_order = MagicMock()
+        upload_call_order.attach_mock(mock_s3_uploader.upload_file, "s3_upload_file")
+        upload_call_order.attach_mock(mock_s3_uploader.wait_for_upload, "s3_wait_for_upload")
+        upload_call_order.attach_mock(mock_azure_uploader.upload_file, "azure_upload_file")
+        upload_call_order.attach_mock(mock_azure_uploader.wait_for_upload, "azure_wait_for_upload")
+        upload_call_order.attach_mock(mock_azure_uploader.delete_file, "azure_delete_file")
+
         # Mock the Chrome driver
         mock_driver = create_mock_google_meet_driver()
         MockChromeDriver.return_value = mock_driver
@@ -1405,6 +1443,93 @@ class TestGoogleMeetBot2(TransactionTestCase):
         # Verify only one delete_file call (for the regular storage uploader)
         mock_azure_uploader.delete_file.assert_called_once()
 
+        # Both uploads must be started before either is waited on, so they run concurrently,
+        # and the local file can only be deleted once both uploads have finished
+        called_methods = [method_call[0] for method_call in upload_call_order.method_calls]
+        self.assertEqual(called_methods[:2], ["s3_upload_file", "azure_upload_file"])
+        self.assertEqual(sorted(called_methods[2:4]), ["azure_wait_for_upload", "s3_wait_for_upload"])
+        self.assertEqual(called_methods[4:], ["azure_delete_file"])
+
+        # Cleanup
+        controller.cleanup()
+        bot_thread.join(timeout=5)
+
+        # Close the database connection since we're in a thread
+        connection.close()
+
+    @patch("bots.models.Bot.create_debug_recording", return_value=False)
+    @patch("bots.web_bot_adapter.web_bot_adapter.Display")
+    @patch("bots.web_bot_adapter.web_bot_adapter.webdriver.Chrome")
+    @patch("bots.bot_controller.bot_controller.AzureFileUploader")
+    @patch("bots.google_meet_bot_adapter.google_meet_ui_methods.GoogleMeetUIMethods.check_if_meeting_is_found", return_value=None)
+    @patch("bots.google_meet_bot_adapter.google_meet_ui_methods.GoogleMeetUIMethods.wait_for_host_if_needed", return_value=None)
+    def test_recording_marked_failed_when_upload_times_out(
+        self,
+        mock_wait_for_host_if_needed,
+        mock_check_if_meeting_is_found,
+        MockAzureFileUploader,
+        MockChromeDriver,
+        MockDisplay,
+        mock_create_debug_recording,
+    ):
+        # Configure the mock uploader so that the upload never finishes in time
+        mock_uploader = create_mock_file_uploader()
+        mock_uploader.wait_for_upload.return_value = False
+        MockAzureFileUploader.return_value = mock_uploader
+
+        # Mock the Chrome driver
+        mock_driver = create_mock_google_meet_driver()
+        MockChromeDriver.return_value = mock_driver
+
+        # Mock virtual display
+        mock_display = MagicMock()
+        MockDisplay.return_value = mock_display
+
+        # Create bot controller
+        controller = BotController(self.bot.id)
+
+        # Run the bot in a separate thread since it has an event loop
+        bot_thread = threading.Thread(target=controller.run)
+        bot_thread.daemon = True
+        bot_thread.start()
+
+        def simulate_join_flow():
+            # Sleep to allow initialization
+            time.sleep(2)
+
+            # Add participants to keep the bot in the meeting
+            controller.adapter.participants_info["user1"] = {"deviceId": "user1", "fullName": "Test User", "active": True, "isCurrentUser": False}
+
+            # Let the bot run for a bit to "record"
+            time.sleep(3)
+
+            # Trigger auto-leave
+            controller.adapter.only_one_participant_in_meeting_at = time.time() - 10000000000
+            time.sleep(4)
+
+            # Clean up connections in thread
+            connection.close()
+
+        # Run join flow simulation after a short delay
+        threading.Timer(2, simulate_join_flow).start()
+
+        # Give the bot some time to process
+        bot_thread.join(timeout=10)
+
+        # The bot still finishes post processing
+        self.bot.refresh_from_db()
+        self.assertEqual(self.bot.state, BotStates.ENDED)
+
+        # But the recording is failed and has no file
+        self.recording.refresh_from_db()
+        self.assertEqual(self.recording.state, RecordingStates.FAILED)
+        self.assertFalse(self.recording.file)
+
+        # The upload may still be reading the local file, so it must not be deleted
+        mock_uploader.upload_file.assert_called_once()
+        mock_uploader.wait_for_upload.assert_called_once()
+        mock_uploader.delete_file.assert_not_called()
+
         # Cleanup
         controller.cleanup()
         bot_thread.join(timeout=5)
@@ -68,7 +68,7 @@ def mock_file_field_delete_sets_name_to_none(instance, save=True):
 def create_mock_file_uploader():
     mock_file_uploader = MagicMock(spec=S3FileUploader)
     mock_file_uploader.upload_file.return_value = None
-    mock_file_uploader.wait_for_upload.return_value = None
+    mock_file_uploader.wait_for_upload.return_value = True
     mock_file_uploader.delete_file.return_value = None
     mock_file_uploader.filename = "test-recording-key"  # Simple string attribute
     return mock_file_uploader
@@ -14,7 +14,7 @@ from bots.models import Bot, BotEventManager, BotEventSubTypes, BotEventTypes, B
 def create_mock_file_uploader():
     mock_file_uploader = MagicMock()
     mock_file_uploader.upload_file.return_value = None
-    mock_file_uploader.wait_for_upload.return_value = None
+    mock_file_uploader.wait_for_upload.return_value = True
     mock_file_uploader.delete_file.return_value = None
     mock_file_uploader.filename = "test-recording-key"
     return mock_file_uploader